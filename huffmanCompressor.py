@@ -18,9 +18,449 @@ Note 2: when no out-file is specified the input file will be used as a base to g
 
 
 # imports
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from pickle import dumps, loads
 import argparse
+import heapq
+import mmap
+import os
+import struct
+
+import numpy as np
+
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:  # numba is optional, without it the kernels below run as regular python and hold the GIL
+    HAS_NUMBA = False
+
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+# compressed data starts with MAGIC followed by the number of chunks
+# each chunk is compressed on its own with its own huffman tree so chunks can be worked on in parallel
+MAGIC = b"HFC\x02"
+CHUNK_SIZE = 128 * 1024
+FILE_HEADER = struct.Struct(">4sQ")  # MAGIC, number of chunks
+
+# every chunk starts with a header followed by its compressed string
+# mode, number of characters, 256 code lengths, number of padding bits, length of compressed string
+CHUNK_HEADER = struct.Struct(">BI256sBI")
+
+# mode of a chunk says how its compressed string is read
+CODED_CHUNK = 0  # huffman coded with the canonical codes for the code lengths
+STORED_CHUNK = 1  # characters stored as they are
+RUN_CHUNK = 2  # single character repeated, the only character with a code length, no compressed string
+
+# chunks that would not compress below this fraction of their size are stored as they are
+STORE_RATIO = 0.95
+
+# longest code that can be shifted into the 64 bit buffer of the kernels alongside up to 7 leftover bits
+MAX_CODE_LENGTH = 57
+
+# number of bits used to index the decoding lookup tables, codes up to this long are decoded with a single lookup
+TABLE_BITS = 10
+
+
+@njit(nogil=True, cache=True)
+def _count_bytes(chunk_array):
+    """
+    Counts the occurrences of every byte value in chunk_array
+
+    Arguments:
+        chunk_array: uint8 array of the characters to be counted
+    :return: int64 array of the count for each of the 256 byte values
+    """
+    byte_counts = np.zeros(256, dtype=np.int64)
+    for index in range(chunk_array.size):
+        byte_counts[chunk_array[index]] += 1
+    return byte_counts
+
+
+@njit(nogil=True, cache=True)
+def _encode_bits(worker_array, codes, lengths, encoded):
+    """
+    Packs the code of every character in worker_array into encoded
+    Codes are shifted into a 64 bit buffer which is only emptied into whole bytes when the next code would not fit,
+    so most characters cost a single shift instead of a check for complete bytes
+    Any bits left over at the end are padded with 1s up to a full byte
+
+    Arguments:
+        worker_array: uint8 array of the characters to be compressed
+        codes: uint64 array of the huffman code for each character
+        lengths: uint8 array of the number of bits in each code
+        encoded: preallocated uint8 array that is large enough to hold every packed bit
+    """
+    bit_buffer = np.uint64(0)
+    buffered_bits = 0
+    position = 0
+    for index in range(worker_array.size):
+        char = worker_array[index]
+        code_length = int(lengths[char])
+        if buffered_bits + code_length > 64:
+            while buffered_bits >= 8:
+                buffered_bits -= 8
+                encoded[position] = (bit_buffer >> np.uint64(buffered_bits)) & np.uint64(0xFF)
+                position += 1
+            bit_buffer &= (np.uint64(1) << np.uint64(buffered_bits)) - np.uint64(1)  # drops bits that have already been written
+        bit_buffer = (bit_buffer << np.uint64(code_length)) | codes[char]
+        buffered_bits += code_length
+
+    while buffered_bits >= 8:
+        buffered_bits -= 8
+        encoded[position] = (bit_buffer >> np.uint64(buffered_bits)) & np.uint64(0xFF)
+        position += 1
+
+    if buffered_bits:
+        padding = np.uint64(8 - buffered_bits)
+        encoded[position] = ((bit_buffer << padding) | ((np.uint64(1) << padding) - np.uint64(1))) & np.uint64(0xFF)
+
+
+def _encode_bits_numpy(worker_array, codes, lengths, encoded):
+    """
+    Packs the code of every character in worker_array into encoded without a per character python loop
+    Used in place of _encode_bits when numba is not installed and that kernel would run as regular python
+    Every bit of every code is scattered into an array of 1s and 0s which is then packed into bytes with np.packbits
+    The array starts as all 1s so any bits left over at the end are already padded
+
+    Arguments:
+        worker_array: uint8 array of the characters to be compressed
+        codes: uint64 array of the huffman code for each character
+        lengths: uint8 array of the number of bits in each code
+        encoded: preallocated uint8 array that is exactly large enough to hold every packed bit
+    """
+    char_lengths = lengths[worker_array].astype(np.int64)
+    char_codes = codes[worker_array]
+    char_offsets = np.cumsum(char_lengths) - char_lengths  # position of the first bit of each character's code
+
+    bit_array = np.ones(encoded.size * 8, dtype=np.uint8)
+    for bit in range(int(lengths.max(initial=0))):  # fills in bit number "bit" of every code that is long enough
+        has_bit = char_lengths > bit
+        shift = (char_lengths[has_bit] - 1 - bit).astype(np.uint64)
+        bit_array[char_offsets[has_bit] + bit] = (char_codes[has_bit] >> shift) & np.uint64(1)
+
+    encoded[:] = np.packbits(bit_array)
+
+
+def _canonical_codes(lengths):
+    """
+    Assigns canonical huffman codes using only the length of each character's code
+    Characters are ordered by code length then by value and given consecutive codes,
+    so the same lengths always produce the same codes
+
+    Arguments:
+        lengths: uint8 array of the number of bits in each character's code (0 if the character is unused)
+    :return: uint64 array of the code for each character
+    """
+    codes = np.zeros(256, dtype=np.uint64)
+    code, last_length = 0, 0
+    for char in np.lexsort((np.arange(256), lengths)):  # sorts by length first then by character
+        length = int(lengths[char])
+        if not length:
+            continue
+        code <<= length - last_length
+        codes[char] = code
+        code += 1
+        last_length = length
+    return codes
+
+
+def _build_children(codes, lengths):
+    """
+    Rebuilds the huffman tree from the code tables as an array of child nodes that the decoding kernel can walk
+    Each row is a branch with the child reached by a 0 bit and the child reached by a 1 bit
+    Branches are stored as the index of their row and characters are stored as -(char + 1)
+
+    Arguments:
+        codes: uint64 array of the code for each character
+        lengths: uint8 array of the number of bits in each character's code
+    :return: int64 array of shape (branch count, 2) with the root branch in row 0
+    """
+    children = [[0, 0]]  # 0 is never a valid child since it is the root, so it marks an empty slot
+    for char in np.flatnonzero(lengths):
+        code, length = int(codes[char]), int(lengths[char])
+        branch = 0
+        for depth in range(length - 1, 0, -1):  # follows every bit of the code except the last
+            bit = (code >> depth) & 1
+            if not children[branch][bit]:
+                children[branch][bit] = len(children)
+                children.append([0, 0])
+            branch = children[branch][bit]
+        children[branch][code & 1] = -(int(char) + 1)
+    return np.array(children, dtype=np.int64)
+
+
+@njit(nogil=True, cache=True)
+def _build_decode_table(children):
+    """
+    Builds lookup tables indexed by the next TABLE_BITS bits of compressed data
+    If a full code fits in those bits the table holds the character and the length of its code
+    If the code is longer the length is set to 0 and the table holds the branch reached after those bits
+
+    Arguments:
+        children: tree created by _build_children
+    :return: tuple of (characters, code lengths, branches) arrays with 2 ** TABLE_BITS entries each
+    """
+    table_size = 1 << TABLE_BITS
+    table_chars = np.zeros(table_size, dtype=np.uint8)
+    table_lengths = np.zeros(table_size, dtype=np.uint8)
+    table_branches = np.zeros(table_size, dtype=np.int64)
+    for prefix in range(table_size):
+        branch = 0
+        for depth in range(1, TABLE_BITS + 1):
+            child = children[branch, (prefix >> (TABLE_BITS - depth)) & 1]
+            if child < 0:
+                table_chars[prefix] = -child - 1
+                table_lengths[prefix] = depth
+                break
+            branch = child
+        if not table_lengths[prefix]:
+            table_branches[prefix] = branch
+    return table_chars, table_lengths, table_branches
+
+
+@njit(nogil=True, cache=True)
+def _decode_bits(decomp_array, total_bits, children, table_chars, table_lengths, table_branches, decoded):
+    """
+    Decodes total_bits bits of decomp_array into decoded using the lookup tables
+    Compressed bytes are shifted into a 64 bit buffer and the next TABLE_BITS bits are used to look up each character
+    Codes longer than TABLE_BITS bits finish by walking the tree one bit at a time
+
+    Arguments:
+        decomp_array: uint8 array of compressed data
+        total_bits: number of bits in decomp_array that are not padding
+        children: tree created by _build_children
+        table_chars, table_lengths, table_branches: lookup tables created by _build_decode_table
+        decoded: preallocated uint8 array that is large enough to hold every decoded character
+    :return: tuple of (number of characters written to decoded, number of bits used)
+    Decoding stops early if a code needs more bits than the data has left
+    """
+    bit_buffer = np.uint64(0)
+    buffered_bits = 0
+    read_position = 0
+    used_bits = 0
+    position = 0
+    while used_bits < total_bits and position < decoded.size:
+        while buffered_bits <= 56 and read_position < decomp_array.size:  # tops the buffer back up with whole bytes
+            bit_buffer = (bit_buffer << np.uint64(8)) | np.uint64(decomp_array[read_position])
+            buffered_bits += 8
+            read_position += 1
+
+        table_mask = np.uint64((1 << TABLE_BITS) - 1)
+        if buffered_bits >= TABLE_BITS:
+            prefix = (bit_buffer >> np.uint64(buffered_bits - TABLE_BITS)) & table_mask
+        else:  # last few bits of the data are looked up as if they were followed by 0s
+            prefix = (bit_buffer << np.uint64(TABLE_BITS - buffered_bits)) & table_mask
+
+        code_length = int(table_lengths[prefix])
+        if code_length:
+            if code_length > buffered_bits:  # code was only found by looking past the end of the data
+                return position, used_bits
+            decoded[position] = table_chars[prefix]
+            buffered_bits -= code_length
+            used_bits += code_length
+        else:
+            if buffered_bits < TABLE_BITS:  # data ended before the first TABLE_BITS bits of the code
+                return position, used_bits
+            branch = table_branches[prefix]
+            buffered_bits -= TABLE_BITS
+            used_bits += TABLE_BITS
+            while True:
+                if buffered_bits == 0:
+                    if read_position >= decomp_array.size:  # data ended partway through a code
+                        return position, used_bits
+                    bit_buffer = np.uint64(decomp_array[read_position])
+                    buffered_bits = 8
+                    read_position += 1
+                buffered_bits -= 1
+                used_bits += 1
+                child = children[branch, (bit_buffer >> np.uint64(buffered_bits)) & np.uint64(1)]
+                if child < 0:
+                    decoded[position] = -child - 1
+                    break
+                branch = child
+        position += 1
+
+    return position, used_bits
+
+
+def _new_chunk(mode:int, len_chunk:int, lengths:bytes, padding:int, len_payload:int) -> bytearray:
+    """
+    Allocates a compressed chunk and writes its header, leaving space after the header for the compressed string
+
+    Arguments:
+        mode: CODED_CHUNK, STORED_CHUNK or RUN_CHUNK
+        len_chunk: number of characters in the chunk
+        lengths: 256 bytes holding the length of each character's code
+        padding: number of padding bits at the end of the compressed string
+        len_payload: length of the compressed string
+    :return: bytearray of CHUNK_HEADER.size + len_payload bytes
+    """
+    compressed = bytearray(CHUNK_HEADER.size + len_payload)
+    CHUNK_HEADER.pack_into(compressed, 0, mode, len_chunk, lengths, padding, len_payload)
+    return compressed
+
+
+def _compress_chunk(chunk:bytes) -> tuple:
+    """
+    Compresses a single chunk of the worker string using a huffman tree created from that chunk alone
+    The compressed chunk starts with its number of characters, the 256 code lengths, the padding and the length of
+    the compressed string, code lengths are all that is needed to rebuild the canonical codes
+    Chunks that would barely shrink are stored as they are and chunks of a single repeated character are stored as a run,
+    the mode at the start of the header says which of these a chunk is
+
+    Arguments:
+        chunk: bytes to be compressed
+    :return: tuple of (frequency, tree as a list of parent nodes, codes, lengths, compressed chunk)
+    """
+
+    # -------------------- #
+    # counts the occurrences of unique characters (bytes) in chunk
+    # numpy views the chunk as a uint8 array without copying and every byte value is totalled in one pass
+    # np.bincount is used when numba is not installed since _count_bytes would then loop in regular python
+    chunk_array = np.frombuffer(chunk, dtype=np.uint8)
+    byte_counts = _count_bytes(chunk_array) if HAS_NUMBA else np.bincount(chunk_array, minlength=256)
+    frequency = {int(char): int(count) for char, count in enumerate(byte_counts) if count}
+
+    # -------------------- #
+    # a chunk of a single repeated character is stored as a run, its header alone is enough to rebuild it
+
+    if len(frequency) == 1:
+        lengths = np.zeros(256, dtype=np.uint8)
+        lengths[list(frequency)] = 1
+        compressed = _new_chunk(RUN_CHUNK, len(chunk), lengths.tobytes(), 0, 0)
+        return frequency, [0], _canonical_codes(lengths), lengths, compressed
+
+    # -------------------- #
+    # creates huffman tree and associated code tables using frequency dictionary
+
+    # characters are nodes 0 to n - 1 and every merge creates the next node after them
+    # the tree is kept as the parent of each node, the root is the last node created and is its own parent
+    chars = list(frequency)
+    tree = list(range(2 * len(chars) - 1))
+
+    # builds a min-heap of (frequency, node) so the two least frequent nodes can be popped directly
+    # node numbers are unique so they also break ties between equal frequencies
+    forest = [(freq, node) for node, freq in enumerate(frequency.values())]
+    heapq.heapify(forest)
+    new_node = len(forest)
+
+    while len(forest) > 1:  # loop runs until only the root of the tree is left
+        freq1, node1 = heapq.heappop(forest)
+        freq2, node2 = heapq.heappop(forest)
+        tree[node1] = tree[node2] = new_node
+        heapq.heappush(forest, (freq1 + freq2, new_node))
+        new_node += 1
+
+    # a parent is always created after its children so walking the nodes backwards gives every parent's depth first
+    # only the depth of each character is needed since the codes themselves are assigned canonically from them
+    depths = [0] * len(tree)
+    for node in range(len(tree) - 2, -1, -1):
+        depths[node] = depths[tree[node]] + 1
+
+    lengths = np.zeros(256, dtype=np.uint8)
+    lengths[chars] = depths[:len(chars)]
+    codes = _canonical_codes(lengths)
+
+    # -------------------- #
+    # converts chunk to compressed form using the code tables
+
+    # the total number of bits is known from the frequencies so the whole compressed chunk can be allocated up front
+    total_bits = int(np.dot(byte_counts.astype(np.uint64), lengths.astype(np.uint64)))
+    padding = -total_bits & 7  # number of padded bits is recorded and stored in binary data
+    len_payload = (total_bits + padding) // 8
+
+    # stores the chunk as it is if encoding it would barely save anything, skipping the encoding pass entirely
+    # both modes write the same header so only the payloads are compared
+    if len_payload > STORE_RATIO * len(chunk):
+        compressed = _new_chunk(STORED_CHUNK, len(chunk), bytes(256), 0, len(chunk))
+        compressed[CHUNK_HEADER.size:] = chunk
+        return frequency, tree, codes, lengths, compressed
+
+    compressed = _new_chunk(CODED_CHUNK, len(chunk), lengths.tobytes(), padding, len_payload)
+
+    # the kernel packs the codes straight into the space left after the header
+    encoder = _encode_bits if HAS_NUMBA else _encode_bits_numpy
+    encoder(chunk_array, codes, lengths, np.frombuffer(compressed, dtype=np.uint8)[CHUNK_HEADER.size:])
+
+    return frequency, tree, codes, lengths, compressed
+
+
+def _decompress_chunk(mode:int, len_chunk:int, lengths:bytes, padding:int, decomp_string:bytes, decoded):
+    """
+    Decompresses a single chunk that was created by _compress_chunk
+
+    Arguments:
+        mode: CODED_CHUNK, STORED_CHUNK or RUN_CHUNK
+        len_chunk: number of characters to decode
+        lengths: 256 bytes holding the length of each character's code
+        padding: number of padding bits at the end of decomp_string
+        decomp_string: compressed string
+        decoded: uint8 array of len_chunk characters that the chunk is decompressed into
+    """
+    lengths = np.frombuffer(lengths, dtype=np.uint8)
+    decomp_array = np.frombuffer(decomp_string, dtype=np.uint8)
+    if mode == STORED_CHUNK:  # chunk was stored without being encoded
+        if decomp_array.size != len_chunk:
+            raise ValueError("Could not decompress chunk, stored chunk is the wrong size")
+        decoded[:] = decomp_array
+        return
+
+    if mode == RUN_CHUNK:  # chunk is a run of a single character
+        if decomp_array.size or padding or np.count_nonzero(lengths) != 1 or lengths.max() != 1:
+            raise ValueError("Could not decompress chunk, header is invalid")
+        decoded[:] = np.flatnonzero(lengths)[0]
+        return
+
+    if mode != CODED_CHUNK:
+        raise ValueError(f"Could not decompress chunk with unknown mode {mode}")
+
+    # checks the header describes codes that could have been created by _compress_chunk before building anything from it
+    # output is bounded by CHUNK_SIZE and, since every code is at least one bit long, by the number of bits
+    longest = int(lengths.max())
+    if np.count_nonzero(lengths) < 2 or longest > MAX_CODE_LENGTH or padding > 7 or \
+            len_chunk > min(CHUNK_SIZE, decomp_array.size * 8):
+        raise ValueError("Could not decompress chunk, header is invalid")
+    used_lengths = lengths[lengths > 0].astype(np.int64)
+    if sum(1 << (longest - length) for length in used_lengths.tolist()) > 1 << longest:
+        raise ValueError("Could not decompress chunk, code lengths do not form a valid huffman code")
+
+    total_bits = decomp_array.size * 8 - padding  # removes padding bits from end of compressed string
+
+    # decompresses decomp_array using lookup tables built from the canonical codes
+    children = _build_children(_canonical_codes(lengths), lengths)
+    table_chars, table_lengths, table_branches = _build_decode_table(children)
+
+    decoded_count, used_bits = _decode_bits(decomp_array, total_bits, children, table_chars, table_lengths,
+                                            table_branches, decoded)
+    if decoded_count != len_chunk:
+        raise ValueError("Could not decompress chunk, compressed data ended early")
+    if used_bits > total_bits:  # the last code ran into the padding bits
+        raise ValueError("Could not decompress chunk, compressed data ended partway through a code")
+    if used_bits < total_bits:
+        raise ValueError("Could not decompress chunk, compressed data has bits left over")
+
+
+def _run_chunks(function, chunk_jobs:list) -> list:
+    """
+    Runs function over every job in chunk_jobs using a pool of threads
+    The numba kernels release the GIL so chunks are worked on in parallel without copying them to other processes
+    A single job is run directly since starting the pool would cost more than it saves
+
+    Arguments:
+        function: function to be called for each job
+        chunk_jobs: list of arguments for function, jobs that are tuples are unpacked into multiple arguments
+    :return: list of results in the same order as chunk_jobs
+    """
+    chunk_jobs = [job if isinstance(job, tuple) else (job,) for job in chunk_jobs]
+    if len(chunk_jobs) <= 1:
+        return [function(*job) for job in chunk_jobs]
+
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as pool:
+        return list(pool.map(function, *zip(*chunk_jobs)))
+
 
 class Huffman:
     """
@@ -30,6 +470,7 @@ class Huffman:
     Methods:
         __init__: initializes class variables
         new_worker: sets new worker string and clears associated variables
+        release_map: closes memory map backing worker string
         new_out: sets new output file
         export_product: saves product string to file or prints to stdout
         compress: compresses worker string using huffman tree that is created by function
@@ -47,10 +488,13 @@ class Huffman:
 
         # placeholders
         self.worker: bytes = b""
+        self.worker_map: mmap.mmap = None  # memory map backing worker when it was read from a file
+        self.worker_file: Path = None
         self.out_file: Path = None
         self.output: bytes = b""
         # comp_tools is all the elements that are created then used to compress the worker string (not used for decomp)
-        self.comp_tools = {"frequency": {}, "tree": [], "trace": {}}
+        # each element is a list with one entry per compressed chunk
+        self.comp_tools = {"frequency": [], "tree": [], "codes": [], "lengths": []}
 
         self.new_worker(content_in)  # gets initial string to be worked on and loads to self.working_string
         if file_out:
@@ -62,7 +506,8 @@ class Huffman:
         Can take a string, bytestring/bytearray, and pathlib.Path object
         If new_in is a string, it is encoded to bytes using the .encode() method
         If new_string is bytes, it is saved directly to worker
-        IF new_string is Path object, the files contents are read into worker using the .read_bytes() method
+        IF new_string is Path object, the file is memory mapped and worker is set to a memoryview of the map,
+        so the file is paged in as it is used instead of being read into memory all at once
 
         Also resets output and comp_tools variables
 
@@ -72,11 +517,18 @@ class Huffman:
 
         is_type = type(new_in)
         self.output = b""  # resets output since it is no longer associated with the worker
-        self.comp_tools = {"frequency": {}, "tree": [], "trace": {}}  # resets comp_tools
+        self.comp_tools = {"frequency": [], "tree": [], "codes": [], "lengths": []}  # resets comp_tools
+        self.release_map()  # closes memory map of the previous worker file if there is one
 
-        if issubclass(is_type, Path):  # if new_in is pathlib.Path, file is read in using read_bytes method
+        if issubclass(is_type, Path):  # if new_in is pathlib.Path, file is memory mapped
             if new_in.exists():
-                self.worker = new_in.read_bytes()  # calls read_bytes() method to read binary from file
+                if new_in.stat().st_size:
+                    with new_in.open("rb") as reader:  # the map keeps its own handle so the file can be closed
+                        self.worker_map = mmap.mmap(reader.fileno(), 0, access=mmap.ACCESS_READ)
+                    self.worker = memoryview(self.worker_map)
+                    self.worker_file = new_in
+                else:  # empty files cannot be memory mapped
+                    self.worker = b""
             else:
                 raise FileNotFoundError(f"Could not find file \"{new_in}\"")
 
@@ -89,6 +541,23 @@ class Huffman:
         else:
             raise TypeError(f"Could not import type {is_type}")
 
+    def release_map(self):
+        """
+        Closes the memory map backing worker if worker was read from a file
+        Worker is set to an empty bytestring when a map is closed
+        """
+        if self.worker_map is None:
+            return
+
+        try:
+            self.worker.release()
+            self.worker_map.close()
+        except BufferError:  # arrays still viewing the worker keep the map open until they are garbage collected
+            pass
+        self.worker = b""
+        self.worker_map = None
+        self.worker_file = None
+
     def new_out(self, new_path:Path):
         """
         Sets path for exported files
@@ -115,8 +584,16 @@ class Huffman:
             self.new_out(alt_out)
 
         if self.out_file:
+            # writing over the mapped worker file would pull the data out from under the map
+            # so the worker is copied into memory first
+            if self.worker_file and self.out_file.exists() and self.out_file.samefile(self.worker_file):
+                worker_copy = bytes(self.worker)
+                self.release_map()
+                self.worker = worker_copy
+
             print(f"Writing data to file \"{self.out_file}\"")
-            self.out_file.write_bytes(self.output)
+            with self.out_file.open("wb") as writer:
+                writer.write(memoryview(self.output))
         else:
             print("No output file specified, data will be written to screen.")
             try:
@@ -133,97 +610,29 @@ class Huffman:
             self.new_out(alt_out)
 
         # -------------------- #
-        # counts the occurrences of unique characters (bytes) in worker string and saves value to self.comp_tools
-        working_frequency = {}
-        for char in self.worker:
-            if char in working_frequency:
-                working_frequency[char] += 1
-            else:
-                working_frequency[char] = 1
-        self.comp_tools["frequency"] = working_frequency
-
-        # -------------------- #
-        # creates huffman tree and associated trace dictionary using frequency dictionary
+        # splits worker string into chunks and compresses each one in parallel
 
-        # sorts from the highest frequency to the lowest
-        # converts into tuple list with new dictionary that will be used to construct the trace dictionary
-        sorted_frequency = \
-            [(char[0], char[1], {char[0]: ""}) for char in sorted(self.comp_tools["frequency"].items(), key=lambda keys: keys[1], reverse=True)]
+        worker_view = memoryview(self.worker)  # slicing a memoryview gives each chunk without copying the worker string
+        chunk_jobs = [worker_view[start:start + CHUNK_SIZE] for start in range(0, len(self.worker), CHUNK_SIZE)]
+        compressed_chunks = _run_chunks(_compress_chunk, chunk_jobs)
 
-        # lambda function to update character trace with desired character
-        char_count = lambda app_val, count_loc: {char: app_val + counter for char, counter in count_loc.items()}
-
-        while len(sorted_frequency) > 2:  # loop runs until there are only 2 top level elements left
-            set1, set2 = sorted_frequency.pop(-1), sorted_frequency.pop(-1)  # pops last two elements from list
-
-            # creates new branch element
-            branch_worker = [set1[0], set2[0]]  # new branch
-            branch_freq = set1[1] + set2[1]  # new frequency for branch created by adding frequency of old elements
-            char_tracker = char_count("0", set1[2]) | char_count("1", set2[2])  # updates trace dicts and combines into one
-
-            new_branch = (branch_worker, branch_freq, char_tracker)  # combines work into complete new element
-            sorted_frequency.append(new_branch)
-
-            # resorts list for next run
-            sorted_frequency = [char for char in
-                                sorted(sorted_frequency, key=lambda keys: keys[1], reverse=True)]  # re-sorts
-
-        self.comp_tools["tree"] = [branch[0] for branch in sorted_frequency]  # strips elements to pure branch lists
-        self.comp_tools["trace"] = char_count("0", sorted_frequency[0][2]) | char_count("1", sorted_frequency[1][2])  # strips out and combines trace dicts
-
-        # -------------------- #
-        # converts self.worker to compressed form using trace dictionary
-
-        encoded = "".join([self.comp_tools["trace"][char] for char in self.worker])
-
-        # pads bits up to the nearest byte so things don't break
-        # number of padded bytes is recorded and stored in binary data
-        padding = 0
-        while len(encoded) % 8 != 0:
-            encoded += "1"
-            padding += 1
-
-        # at this point the string is ones and zeros (ie: "11010010")
-        # separates string into 8 character chunks and converts into integer values, adding to a list
-        chunked = [padding]  # the number of padding bits is the first byte in the array
-        for chunk in range(0, len(encoded), 8):
-            chunked.append(int(encoded[chunk:chunk + 8], 2))
-
-        byte_convert = bytearray(chunked)  # converts list of ints into byte array
+        for frequency, tree, codes, lengths, _ in compressed_chunks:
+            self.comp_tools["frequency"].append(frequency)
+            self.comp_tools["tree"].append(tree)
+            self.comp_tools["codes"].append(codes)
+            self.comp_tools["lengths"].append(lengths)
 
         # -------------------- #
-        # adds huffman tree to start of bytearray and saves to self.output and calls export function
+        # adds magic and number of chunks to start of compressed chunks and saves to self.output and calls export function
 
-        try:
-            pickle_tree = dumps(self.comp_tools["tree"])
-            len_tree = len(pickle_tree).to_bytes(2, "big")
-            self.output = len_tree + pickle_tree + byte_convert
-        except OverflowError:
-            raise OverflowError("Could not convert length of huffman tree to bytes")
+        file_header = FILE_HEADER.pack(MAGIC, len(compressed_chunks))
+        self.output = file_header + b"".join(chunk[4] for chunk in compressed_chunks)
 
         if export:  # exports created product if specified
             self.export_product(alt_out)
 
     def decompress(self, alt_in = None, alt_out:Path = None, export = True):
 
-        def recursion(branch:list, section:str) -> tuple:
-            """
-            Recursive function to decoded characters from tree
-            :param branch: slice of nested tree to be looked in
-            :param section: string of 1s and 0s that is being recoded
-            :return: final recursion layer returns a single character and the string
-            """
-
-            new_val = int(section[0])  # takes first "bit" from string and converts to int
-            cut_down = section[1:]  # removes character from string
-
-            # checks if new int returns character from tree
-            # if it does the character is returned, if not function is recursed
-            if isinstance(branch[new_val], int):
-                return branch[new_val], cut_down
-            else:
-                return recursion(branch[new_val], cut_down)
-
         # if alternate worker/out file are specified, call functions to set them as main
         if alt_in:
             self.new_worker(alt_in)
@@ -231,29 +640,42 @@ class Huffman:
             self.new_out(alt_out)
 
         # -------------------- #
-        # gets huffman tree and compressed content from self.worker
-        len_tree = int.from_bytes(self.worker[:2], "big")  # grabs first two bytes to get length of decompression tree
-        decomp_tree = loads(self.worker[2:len_tree + 2])  # pulls decompress tree from file and converts to list with pickle
-        padding = self.worker[len_tree + 2]  # pulls out length of bit padding for compressed string
-        decomp_string = self.worker[len_tree + 3:]  # pulls compressed string
-
-        bit_string = ""
-        for num in decomp_string:  # iterates though bytes string and converts to string of 1s and 0s (ie: "10010110")
-            bit_string += bin(num)[2:].zfill(8)
-
-        bit_string = bit_string[:-padding]  # removes padding bits from end of string
+        # reads the header of every chunk to find where each one starts and ends
+
+        if len(self.worker) < FILE_HEADER.size:
+            raise ValueError("Could not decompress data that was not created by Huffman.compress")
+        magic, chunk_count = FILE_HEADER.unpack_from(self.worker)
+        if magic != MAGIC:
+            raise ValueError("Could not decompress data that was not created by Huffman.compress")
+
+        chunk_jobs = []
+        cursor = FILE_HEADER.size
+        len_output = 0
+        for _ in range(chunk_count):
+            if cursor + CHUNK_HEADER.size > len(self.worker):
+                raise ValueError("Could not decompress data, it ended partway through a chunk header")
+            mode, len_chunk, lengths, padding, len_payload = CHUNK_HEADER.unpack_from(self.worker, cursor)
+            if len_chunk > CHUNK_SIZE:  # compress never writes larger chunks, this stops a header claiming huge output
+                raise ValueError("Could not decompress data, chunk header has too many characters")
+            cursor += CHUNK_HEADER.size
+            if cursor + len_payload > len(self.worker):
+                raise ValueError("Could not decompress data, it ended partway through a chunk")
+            decomp_string = self.worker[cursor:cursor + len_payload]  # compressed string
+            chunk_jobs.append((mode, len_chunk, lengths, padding, decomp_string, len_output))
+            cursor += len_payload
+            len_output += len_chunk
+        if cursor != len(self.worker):  # trailing bytes or a chunk count that misses some chunks
+            raise ValueError("Could not decompress data, it has bytes left over after the last chunk")
 
         # -------------------- #
-        # decompresses bit_string using huffman tree
-
-        decoded: list[int]= []
-        # while loop runs so long as characters are decode string
-        while bit_string:
-            char, new_work = recursion(decomp_tree, bit_string)
-            decoded.append(char)  # appends found value to string
-            bit_string = new_work  # assigns cut down string to decode string
-
-        self.output = bytearray(decoded)  # converts array into bytearray and saves to self.output
+        # decompresses every chunk in parallel straight into its place in self.output
+
+        self.output = bytearray(len_output)
+        output_array = np.frombuffer(self.output, dtype=np.uint8)
+        chunk_jobs = [(mode, len_chunk, lengths, padding, decomp_string, output_array[start:start + len_chunk])
+                      for mode, len_chunk, lengths, padding, decomp_string, start in chunk_jobs]
+        _run_chunks(_decompress_chunk, chunk_jobs)
+        del output_array, chunk_jobs  # releases the views so self.output can be resized again
 
         if export:  # exports created product if specified
             self.export_product(alt_out)
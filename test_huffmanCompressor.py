@@ -0,0 +1,175 @@
+"""
+test_huffmanCompressor.py
+
+Tests for huffmanCompressor.py, run with "python -m unittest"
+"""
+
+
+# imports
+from pathlib import Path
+import random
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+import huffmanCompressor
+from huffmanCompressor import Huffman
+
+
+def round_trip(content:bytes) -> tuple:
+    """
+    Compresses then decompresses content
+    :return: tuple of (compressed bytes, decompressed bytes)
+    """
+    compressor = Huffman(content)
+    compressor.compress(export=False)
+    compressed = bytes(compressor.output)
+
+    decompressor = Huffman(compressed)
+    decompressor.decompress(export=False)
+    return compressed, bytes(decompressor.output)
+
+
+def first_chunk_mode(content:bytes) -> int:
+    """
+    :return: mode of the first chunk _compress_chunk creates for content
+    """
+    compressed = huffmanCompressor._compress_chunk(content[:huffmanCompressor.CHUNK_SIZE])[4]
+    return huffmanCompressor.CHUNK_HEADER.unpack_from(compressed)[0]
+
+
+class TestRoundTrip(unittest.TestCase):
+    """
+    Checks that decompressing compressed data gives back the original data
+    """
+    def setUp(self):
+        generator = random.Random(0)
+        self.samples = {
+            "empty": b"",
+            "single byte": b"x",
+            "text": Path(huffmanCompressor.__file__).read_bytes(),
+            "two characters": b"ab" * 5000,
+            "single character run": b"a" * (huffmanCompressor.CHUNK_SIZE * 2 + 7),
+            "every byte value": bytes(range(256)) * 40,
+            "random": generator.randbytes(huffmanCompressor.CHUNK_SIZE + 1000),
+            # exponential weights make some codes longer than the TABLE_BITS lookup
+            "long codes": bytes(generator.choices(range(256), weights=[2 ** (i % 20) for i in range(256)], k=300000)),
+        }
+
+    def test_round_trip(self):
+        for name, content in self.samples.items():
+            with self.subTest(name):
+                _, decompressed = round_trip(content)
+                self.assertEqual(decompressed, content)
+
+    def test_chunk_modes(self):
+        # checks each branch of _compress_chunk is taken by the sample it was made for
+        modes = {name: first_chunk_mode(content) for name, content in self.samples.items() if content}
+        self.assertEqual(modes["single character run"], huffmanCompressor.RUN_CHUNK)
+        self.assertEqual(modes["random"], huffmanCompressor.STORED_CHUNK)
+        self.assertEqual(modes["text"], huffmanCompressor.CODED_CHUNK)
+
+    def test_small_chunk_coded(self):
+        # the chunk header is the same size in every mode so it must not push small compressible chunks to be stored
+        content = self.samples["text"][:500]
+        self.assertEqual(first_chunk_mode(content), huffmanCompressor.CODED_CHUNK)
+        compressed, _ = round_trip(content)
+        stored_size = huffmanCompressor.FILE_HEADER.size + huffmanCompressor.CHUNK_HEADER.size + len(content)
+        self.assertLess(len(compressed), stored_size)
+
+    def test_numpy_encoder_matches(self):
+        # the np.packbits encoder used without numba must write exactly the same bytes
+        for name, content in self.samples.items():
+            with self.subTest(name):
+                compressed, _ = round_trip(content)
+                with mock.patch.object(huffmanCompressor, "HAS_NUMBA", False):
+                    fallback, _ = round_trip(content)
+                self.assertEqual(fallback, compressed)
+
+    def test_file_round_trip(self):
+        content = self.samples["text"] * 3
+        with tempfile.TemporaryDirectory() as folder:
+            original, packed = Path(folder, "original.txt"), Path(folder, "packed.hfc")
+            original.write_bytes(content)
+
+            compressor = Huffman(original, packed)
+            compressor.compress()
+            compressor.release_map()
+
+            decompressor = Huffman(packed, original)  # writes over the original to check the mapped file is released
+            decompressor.decompress()
+            decompressor.release_map()
+            self.assertEqual(original.read_bytes(), content)
+
+
+class TestInvalidData(unittest.TestCase):
+    """
+    Checks that malformed compressed data raises ValueError instead of crashing or allocating huge outputs
+    """
+    def setUp(self):
+        self.compressed, _ = round_trip(Path(huffmanCompressor.__file__).read_bytes() * 2)
+
+    def assert_invalid(self, data:bytes):
+        with self.assertRaises(ValueError):
+            Huffman(bytes(data)).decompress(export=False)
+
+    def chunk(self, mode, len_chunk, lengths, padding=0, payload=b"") -> bytes:
+        return huffmanCompressor.FILE_HEADER.pack(huffmanCompressor.MAGIC, 1) + \
+            huffmanCompressor.CHUNK_HEADER.pack(mode, len_chunk, bytes(lengths), padding, len(payload)) + payload
+
+    def test_not_compressed(self):
+        self.assert_invalid(b"")
+        self.assert_invalid(b"plain text that was never compressed")
+
+    def test_truncated(self):
+        for end in (8, huffmanCompressor.FILE_HEADER.size + 100, len(self.compressed) - 1):
+            with self.subTest(end=end):
+                self.assert_invalid(self.compressed[:end])
+
+    def test_left_over_bytes(self):
+        self.assert_invalid(self.compressed + b"\x00")
+        too_few = bytearray(self.compressed)
+        magic, chunk_count = huffmanCompressor.FILE_HEADER.unpack_from(too_few)
+        huffmanCompressor.FILE_HEADER.pack_into(too_few, 0, magic, chunk_count - 1)
+        self.assert_invalid(too_few)
+
+    def test_corrupted_header(self):
+        corrupted = bytearray(self.compressed)
+        lengths_start = huffmanCompressor.FILE_HEADER.size + 5
+        corrupted[lengths_start:lengths_start + 256] = bytes([1]) * 256  # oversubscribed code lengths
+        self.assert_invalid(corrupted)
+
+    def test_unknown_mode(self):
+        self.assert_invalid(self.chunk(9, 1, bytes(256), payload=b"x"))
+
+    def test_oversized_chunks(self):
+        lengths = np.zeros(256, dtype=np.uint8)
+        lengths[ord("a")] = 1
+        self.assert_invalid(self.chunk(huffmanCompressor.RUN_CHUNK, 0xFFFFFFFF, lengths))
+        self.assert_invalid(self.chunk(huffmanCompressor.RUN_CHUNK, huffmanCompressor.CHUNK_SIZE + 1, lengths))
+
+    def test_invalid_runs(self):
+        lengths = np.zeros(256, dtype=np.uint8)
+        lengths[ord("a")] = 3
+        self.assert_invalid(self.chunk(huffmanCompressor.RUN_CHUNK, 10, lengths))
+        lengths[ord("a")] = 1
+        self.assert_invalid(self.chunk(huffmanCompressor.RUN_CHUNK, 10, lengths, padding=2))
+        self.assert_invalid(self.chunk(huffmanCompressor.RUN_CHUNK, 10, lengths, payload=b"x"))
+
+    def test_coded_bits_run_out(self):
+        # codes are 0 for "\x00", 10 for "\x05" and 11 for "\x09"
+        lengths = np.zeros(256, dtype=np.uint8)
+        lengths[[0, 5, 9]] = [1, 2, 2]
+        coded = huffmanCompressor.CODED_CHUNK
+        self.assert_invalid(self.chunk(coded, 16, lengths, payload=b"\x00\x01"))  # last code needs a missing bit
+        self.assert_invalid(self.chunk(coded, 8, lengths, padding=1, payload=b"\x00"))  # last code is a padding bit
+        self.assert_invalid(self.chunk(coded, 8, lengths, payload=b"\x00\x01"))  # bits left after the last code
+
+    def test_stored_wrong_size(self):
+        self.assert_invalid(self.chunk(huffmanCompressor.STORED_CHUNK, 10, bytes(256), payload=b"short"))
+
+
+if __name__ == "__main__":
+    unittest.main()